@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全平台图标生成脚本
+基于 docs/tool.svg 生成 src-tauri/icons/ 下的全部平台图标
+（目录结构与尺寸清单见 src-tauri/icons/README.md）
+"""
+
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import cairosvg
+from PIL import Image
+
+# SVG 源文件与输出根目录（相对仓库根目录运行）
+SVG_SOURCE = 'docs/tool.svg'
+ICONS_ROOT = 'src-tauri/icons'
+
+# 各平台尺寸清单，与 src-tauri/icons/README.md 保持一致
+WEB_SIZES = [16, 32, 48, 64, 128, 256, 512]
+WINDOWS_SIZES = [16, 32, 48, 64, 128, 256]
+LINUX_SIZES = [16, 24, 32, 48, 64, 128, 256, 512]
+MACOS_SIZES = [16, 32, 64, 128, 256, 512, 1024]
+IOS_SIZES = [57, 60, 72, 76, 114, 120, 144, 152, 180, 192, 220]
+ANDROID_SIZES = [36, 48, 72, 96, 144, 192, 256, 512]
+SOURCE_SIZES = [1024, 2048]
+
+
+# 达到该尺寸的输出视为发布级源文件，保留 zlib 高压缩；
+# 其余小图标是一次性构建产物，用 level 1 快速压缩（体积差异可忽略）
+PUBLISH_SIZE = 1024
+
+
+def save_png(img, output_path, size):
+    """按输出用途选择 PNG 压缩参数后保存"""
+    if size >= PUBLISH_SIZE:
+        img.save(output_path, 'PNG', optimize=True)
+    else:
+        img.save(output_path, 'PNG', optimize=False, compress_level=1)
+
+
+def load_svg_bytes(svg_path=SVG_SOURCE):
+    """读入 SVG 源文件字节（只读一次，后续渲染全部走 bytestring）"""
+    with open(svg_path, 'rb') as f:
+        return f.read()
+
+
+def svg_to_png(svg_bytes, size, output_path, background_color=None):
+    """将 SVG 字节渲染为指定尺寸的 PNG（失败直接抛出，由调用方处理）"""
+    png_bytes = cairosvg.svg2png(
+        bytestring=svg_bytes,
+        output_width=size,
+        output_height=size,
+        background_color=background_color,
+    )
+    # 统一经过 PIL 保存，保证 RGBA 模式与压缩参数一致
+    img = Image.open(BytesIO(png_bytes)).convert('RGBA')
+    save_png(img, output_path, size)
+
+
+# 最大渲染尺寸：SVG 只在该尺寸光栅化一次，其余尺寸由位图缩放得到
+MAX_RENDER_SIZE = 2048
+
+# 每个工作进程持有的基准位图（由进程池 initializer 解码一次）
+_base_image = None
+
+
+def rasterize_base(svg_bytes, max_size=MAX_RENDER_SIZE):
+    """按最大尺寸将 SVG 光栅化一次，返回 PNG 字节"""
+    return cairosvg.svg2png(bytestring=svg_bytes,
+                            output_width=max_size,
+                            output_height=max_size)
+
+
+def _init_resize_worker(base_png_bytes):
+    """进程池初始化：每个工作进程解码一次基准位图"""
+    global _base_image
+    _base_image = Image.open(BytesIO(base_png_bytes)).convert('RGBA')
+
+
+def _resize_job(job):
+    """进程池工作函数：从基准位图缩放出目标尺寸并保存
+
+    不做逐文件日志：print 会在 stdout 锁上串行化，抵消多核收益；
+    失败直接抛出，由 executor.map 在主进程重新抛出。
+    """
+    size, output_path = job
+    if size == _base_image.width:
+        img = _base_image
+    else:
+        img = _base_image.resize((size, size), Image.LANCZOS)
+    save_png(img, output_path, size)
+
+
+def collect_icon_jobs():
+    """收集渲染任务
+
+    返回 (resize_jobs, tinted_jobs)：
+    - resize_jobs: (尺寸, 输出路径)，由基准位图缩放得到
+    - tinted_jobs: (尺寸, 输出路径, 背景色)，由缩放结果合成到纯色背景
+    """
+    resize_jobs = []
+
+    # Web 平台
+    for size in WEB_SIZES:
+        resize_jobs.append((size, f'{ICONS_ROOT}/web/icon-{size}x{size}.png'))
+
+    # Windows 平台
+    for size in WINDOWS_SIZES:
+        resize_jobs.append((size, f'{ICONS_ROOT}/windows/icon-{size}x{size}.png'))
+
+    # Linux 平台
+    for size in LINUX_SIZES:
+        resize_jobs.append((size, f'{ICONS_ROOT}/linux/icon-{size}x{size}.png'))
+
+    # macOS 平台（标准尺寸 + Retina @2x）
+    for size in MACOS_SIZES:
+        resize_jobs.append((size, f'{ICONS_ROOT}/macos/icon_{size}x{size}.png'))
+        if size < 1024:
+            resize_jobs.append(
+                (size * 2, f'{ICONS_ROOT}/macos/icon_{size}x{size}@2x.png'))
+
+    # 移动平台
+    for size in IOS_SIZES:
+        resize_jobs.append((size, f'{ICONS_ROOT}/mobile/ios-{size}x{size}.png'))
+    for size in ANDROID_SIZES:
+        resize_jobs.append((size, f'{ICONS_ROOT}/mobile/android-{size}x{size}.png'))
+
+    # 高分辨率源文件
+    for size in SOURCE_SIZES:
+        resize_jobs.append((size, f'{ICONS_ROOT}/sources/icon-{size}x{size}.png'))
+
+    # Tauri 打包所需的根目录图标
+    resize_jobs.append((32, f'{ICONS_ROOT}/32x32.png'))
+    resize_jobs.append((128, f'{ICONS_ROOT}/128x128.png'))
+    resize_jobs.append((256, f'{ICONS_ROOT}/128x128@2x.png'))
+    resize_jobs.append((512, f'{ICONS_ROOT}/icon.png'))
+
+    # 特殊用途图标：深色/浅色背景版本
+    tinted_jobs = [
+        (64, f'{ICONS_ROOT}/web/icon-64x64-light.png', '#ffffff'),
+        (64, f'{ICONS_ROOT}/web/icon-64x64-dark.png', '#000000'),
+    ]
+
+    return resize_jobs, tinted_jobs
+
+
+def create_favicon(svg_bytes, output_path, sizes=(16, 32, 48)):
+    """生成包含多种尺寸的 favicon.ico（全程在内存中处理）"""
+    images = []
+    for size in sizes:
+        png_bytes = cairosvg.svg2png(bytestring=svg_bytes,
+                                     output_width=size,
+                                     output_height=size)
+        images.append(Image.open(BytesIO(png_bytes)).convert('RGBA'))
+
+    images[0].save(output_path, format='ICO',
+                   sizes=[(img.width, img.height) for img in images],
+                   append_images=images[1:])
+    print(f"✓ 生成: {output_path}")
+
+
+def create_icns(svg_bytes):
+    """在 macOS 上用 iconutil 生成 ICNS 文件（其他平台跳过）"""
+    if sys.platform != 'darwin':
+        print("ℹ️ 非 macOS 平台，跳过 ICNS 生成")
+        return
+
+    iconset_dir = f'{ICONS_ROOT}/macos/icon.iconset'
+    os.makedirs(iconset_dir, exist_ok=True)
+    for size in (16, 32, 128, 256, 512):
+        svg_to_png(svg_bytes, size, f'{iconset_dir}/icon_{size}x{size}.png')
+        svg_to_png(svg_bytes, size * 2,
+                   f'{iconset_dir}/icon_{size}x{size}@2x.png')
+    subprocess.run(['iconutil', '-c', 'icns', iconset_dir,
+                    '-o', f'{ICONS_ROOT}/icon.icns'], check=True)
+    print(f"✓ 生成: {ICONS_ROOT}/icon.icns")
+
+
+def count_icons(root):
+    """递归统计目录下的图标文件数（scandir 复用缓存的文件类型信息）"""
+    total = 0
+    for entry in os.scandir(root):
+        if entry.is_dir(follow_symlinks=False):
+            total += count_icons(entry.path)
+        elif entry.name.endswith(('.png', '.ico')):
+            total += 1
+    return total
+
+
+def print_summary():
+    """统计输出的图标文件数量"""
+    print(f"\n📊 共生成 {count_icons(ICONS_ROOT)} 个图标文件（{ICONS_ROOT}/）")
+
+
+def generate_platform_icons():
+    """生成全平台图标"""
+    if not os.path.exists(SVG_SOURCE):
+        print(f"❌ 找不到 SVG 源文件: {SVG_SOURCE}")
+        return False
+
+    # 预创建输出目录（避免并行任务竞争 mkdir）
+    for sub in ('web', 'windows', 'linux', 'macos', 'mobile', 'sources'):
+        os.makedirs(f'{ICONS_ROOT}/{sub}', exist_ok=True)
+
+    resize_jobs, tinted_jobs = collect_icon_jobs()
+
+    # SVG 解析和光栅化是主要开销：只在最大尺寸渲染一次，
+    # 其余尺寸用 LANCZOS 从基准位图缩放；缩放与保存互相独立且
+    # CPU 密集（PIL 在 C 层执行），用进程池并行处理
+    # SVG 文件只读一次，之后所有渲染都复用内存中的字节
+    svg_bytes = load_svg_bytes()
+
+    print(f"🎨 渲染基准位图 ({MAX_RENDER_SIZE}x{MAX_RENDER_SIZE})...")
+    base_png_bytes = rasterize_base(svg_bytes)
+
+    print(f"🎨 开始并行生成 {len(resize_jobs)} 个图标...")
+    with ProcessPoolExecutor(initializer=_init_resize_worker,
+                             initargs=(base_png_bytes,)) as executor:
+        list(executor.map(_resize_job, resize_jobs))
+    print(f"✓ 缩放图标完成: {len(resize_jobs)} 个")
+
+    # 背景着色版本同样复用基准位图：缩放一次，分别合成到纯色背景
+    base_img = Image.open(BytesIO(base_png_bytes)).convert('RGBA')
+    for size, output_path, background_color in tinted_jobs:
+        scaled = base_img.resize((size, size), Image.LANCZOS)
+        canvas = Image.new('RGBA', (size, size), background_color)
+        canvas.paste(scaled, (0, 0), scaled)
+        save_png(canvas, output_path, size)
+    print(f"✓ 背景着色图标完成: {len(tinted_jobs)} 个")
+
+    # favicon/ICNS 依赖渲染产物，池排空后串行生成
+    create_favicon(svg_bytes, f'{ICONS_ROOT}/web/favicon.ico')
+    create_favicon(svg_bytes, f'{ICONS_ROOT}/windows/app.ico',
+                   sizes=(16, 32, 48, 64, 128, 256))
+    create_icns(svg_bytes)
+
+    print_summary()
+    print("✅ 全平台图标生成完成")
+    return True
+
+
+if __name__ == "__main__":
+    success = generate_platform_icons()
+    sys.exit(0 if success else 1)
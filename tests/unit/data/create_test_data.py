@@ -6,14 +6,81 @@
 
 import sqlite3
 import json
-from cryptography.fernet import Fernet
 import os
+from pathlib import Path
+
+# 优先使用 Rust 实现的 rfernet（密文格式与 cryptography 互通，
+# 但接口类型不同：密钥与密文都是 str，且生成密钥的类方法叫
+# generate_new_key），未安装时回退到 pyca/cryptography；
+# 下面两个辅助函数抹平两个后端的类型差异
+try:
+    from rfernet import Fernet
+    _HAS_RFERNET = True
+except ImportError:
+    from cryptography.fernet import Fernet
+    _HAS_RFERNET = False
+
+
+def _generate_key() -> str:
+    """生成 Fernet 密钥（统一为 str 形式，便于落盘与展示）"""
+    if _HAS_RFERNET:
+        return Fernet.generate_new_key()
+    return Fernet.generate_key().decode()
+
+
+def _make_encryptor(key: str):
+    """返回归一化的加密函数：str 明文 -> str 密文
+
+    密文必须保持 str（TEXT 列，与 Rust 侧解密逻辑兼容）。
+    两个后端都接受 str 密钥（cryptography 内部自行转码）。
+    """
+    enc = Fernet(key).encrypt
+    if _HAS_RFERNET:
+        return lambda plaintext: enc(plaintext.encode())
+    return lambda plaintext: enc(plaintext.encode()).decode()
+
+# 插入语句提升为模块级常量：executemany 对同一字符串只准备一次；
+# type/enabled 对测试数据是定值，直接写进语句，行元组只带变化列
+CLAUDE_INSERT_SQL = '''
+    INSERT INTO claude_providers (name, url, token, type, enabled)
+    VALUES (?, ?, ?, 'public_welfare', 1)
+'''
+
+CODEX_INSERT_SQL = '''
+    INSERT INTO codex_providers (name, url, token, type, enabled)
+    VALUES (?, ?, ?, 'public_welfare', 1)
+'''
+
+AGENT_INSERT_SQL = '''
+    INSERT INTO agent_guides (name, type, text)
+    VALUES (?, ?, ?)
+'''
+
+MCP_INSERT_SQL = '''
+    INSERT INTO mcp_servers (name, type, timeout, command, args, env)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+CONFIG_INSERT_SQL = '''
+    INSERT INTO common_configs (key, value, description, category)
+    VALUES (?, ?, ?, ?)
+'''
+
+# 五张核心表及其中文名称（统计输出用）
+TABLES = (
+    ("claude_providers", "Claude供应商"),
+    ("codex_providers", "Codex供应商"),
+    ("agent_guides", "Agent指导文件"),
+    ("mcp_servers", "MCP服务器"),
+    ("common_configs", "通用配置"),
+)
 
 def create_test_database():
     """创建包含测试数据的源数据库"""
 
-    # 创建数据库
-    conn = sqlite3.connect('test_source.db')
+    # 先在内存数据库中建表和插入（完全没有日志/fsync 开销），
+    # 最后一次性 backup 到磁盘文件
+    conn = sqlite3.connect(':memory:')
     cursor = conn.cursor()
 
     # 创建表结构（与原Python版本一致）
@@ -86,18 +153,13 @@ def create_test_database():
         )
     ''')
 
-    # 生成加密密钥
-    key = Fernet.generate_key().decode()
+    # 生成加密密钥（后端差异见 _generate_key / _make_encryptor）
+    key_str = _generate_key()
 
-    # 保存密钥到环境文件
-    with open('.env', 'w') as f:
-        f.write(f'FERNET_KEY={key}\n')
-        f.write(f'OLD_FERNET_KEY={key}\n')
+    # 保存密钥到环境文件（两行合并成一次写入）
+    Path('.env').write_text(f'FERNET_KEY={key_str}\nOLD_FERNET_KEY={key_str}\n')
 
-    print(f"🔑 生成加密密钥: {key}")
-
-    # 创建加密器
-    fernet = Fernet(key)
+    print(f"🔑 生成加密密钥: {key_str}")
 
     # 插入测试数据
     print("📝 插入测试数据...")
@@ -108,26 +170,12 @@ def create_test_database():
         ("Anthropic Official", "https://api.anthropic.com", "sk-ant-api03-official-456"),
     ]
 
-    for name, url, token in claude_data:
-        encrypted_token = fernet.encrypt(token.encode()).decode()
-        cursor.execute('''
-            INSERT INTO claude_providers (name, url, token, type, enabled)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (name, url, encrypted_token, 'public_welfare', 1))
-
     # Codex供应商
     codex_data = [
         ("Test Codex Provider", "https://api.openai.com", "sk-test-codex-789"),
         ("OpenAI Official", "https://api.openai.com", "sk-official-codex-101"),
     ]
 
-    for name, url, token in codex_data:
-        encrypted_token = fernet.encrypt(token.encode()).decode()
-        cursor.execute('''
-            INSERT INTO codex_providers (name, url, token, type, enabled)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (name, url, encrypted_token, 'public_welfare', 1))
-
     # Agent指导文件
     agent_guides = [
         ("Web开发助手", "and", "这是一个专门用于Web开发的AI助手..."),
@@ -135,24 +183,12 @@ def create_test_database():
         ("代码审查工具", "and", "帮助进行代码质量和安全审查..."),
     ]
 
-    for name, guide_type, text in agent_guides:
-        cursor.execute('''
-            INSERT INTO agent_guides (name, type, text)
-            VALUES (?, ?, ?)
-        ''', (name, guide_type, text))
-
     # MCP服务器
     mcp_servers = [
         ("file-server", "stdio", 30000, "python3", '["/path/to/file_server.py"]', '{"PORT": "8080"}'),
         ("database-proxy", "stdio", 15000, "node", '["db-proxy.js", "--port", "5432"]', None),
     ]
 
-    for name, server_type, timeout, command, args, env in mcp_servers:
-        cursor.execute('''
-            INSERT INTO mcp_servers (name, type, timeout, command, args, env)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (name, server_type, timeout, command, args, env))
-
     # 通用配置
     common_configs = [
         ("app_name", "AI Manager", "应用程序名称", "general"),
@@ -161,37 +197,42 @@ def create_test_database():
         ("theme", "light", "界面主题", "ui"),
     ]
 
-    for key, value, description, category in common_configs:
-        cursor.execute('''
-            INSERT INTO common_configs (key, value, description, category)
-            VALUES (?, ?, ?, ?)
-        ''', (key, value, description, category))
+    # 加密函数在循环外构建一次，避免循环内重复属性查找
+    enc = _make_encryptor(key_str)
+
+    # 预先构建行数据并用 executemany 批量插入，让 SQLite 复用预编译语句；
+    # 所有插入放在同一个显式事务中，只提交一次
+    with conn:
+        cursor.executemany(CLAUDE_INSERT_SQL,
+                           [(name, url, enc(token))
+                            for name, url, token in claude_data])
+        cursor.executemany(CODEX_INSERT_SQL,
+                           [(name, url, enc(token))
+                            for name, url, token in codex_data])
+        cursor.executemany(AGENT_INSERT_SQL, agent_guides)
+        cursor.executemany(MCP_INSERT_SQL, mcp_servers)
+        cursor.executemany(CONFIG_INSERT_SQL, common_configs)
+
+    # 显示统计信息（一条语句取回五张表的行数，省去逐表查询往返；
+    # 查询和输出都由 TABLES 驱动，避免逐表复制粘贴分支）
+    counts_sql = "SELECT " + ", ".join(
+        f"(SELECT COUNT(*) FROM {table})" for table, _ in TABLES)
+    counts = cursor.execute(counts_sql).fetchone()
 
-    conn.commit()
-
-    # 显示统计信息
     print("\n📊 数据库统计:")
-    cursor.execute("SELECT COUNT(*) FROM claude_providers")
-    print(f"  Claude供应商: {cursor.fetchone()[0]} 条")
-
-    cursor.execute("SELECT COUNT(*) FROM codex_providers")
-    print(f"  Codex供应商: {cursor.fetchone()[0]} 条")
-
-    cursor.execute("SELECT COUNT(*) FROM agent_guides")
-    print(f"  Agent指导文件: {cursor.fetchone()[0]} 条")
-
-    cursor.execute("SELECT COUNT(*) FROM mcp_servers")
-    print(f"  MCP服务器: {cursor.fetchone()[0]} 条")
-
-    cursor.execute("SELECT COUNT(*) FROM common_configs")
-    print(f"  通用配置: {cursor.fetchone()[0]} 条")
+    for (_, label), count in zip(TABLES, counts):
+        print(f"  {label}: {count} 条")
 
+    # 内存数据库整体落盘
+    disk_conn = sqlite3.connect('test_source.db')
+    conn.backup(disk_conn)
+    disk_conn.close()
     conn.close()
 
     print(f"\n✅ 测试数据库创建完成: test_source.db")
     print(f"📝 加密密钥已保存到 .env 文件")
 
-    return key
+    return key_str
 
 if __name__ == "__main__":
     create_test_database()
\ No newline at end of file